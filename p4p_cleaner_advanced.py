@@ -1,35 +1,50 @@
 import argparse
 import collections
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import fnmatch
+import functools
+import heapq
 import json
 import logging
+import logging.handlers
+import math
 import os
+import re
 import shutil
-import sqlite3
 import sys
 import threading
 import time
 
 from PySide6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog, QTextEdit,
+    QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QFileDialog, QPlainTextEdit,
     QProgressBar, QHBoxLayout, QSpinBox, QLineEdit, QCheckBox, QGroupBox, QRadioButton,
     QButtonGroup, QListWidget, QStackedWidget, QDialog, QSizePolicy
 )
 from PySide6.QtGui import QIcon, QFont
-from PySide6.QtCore import Qt, Signal, QThread
+from PySide6.QtCore import Qt, Signal, QThread, QTimer
 
 APPDATA_DIR = os.path.join(os.environ.get("APPDATA", "."), "P4PCleaner")
 os.makedirs(APPDATA_DIR, exist_ok=True)
 LOG_FILE = os.path.join(APPDATA_DIR, f"cleaner_{time.strftime('%Y%m%d-%H%M%S')}.log")
 
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s"
-)
+_log_file_handler = logging.FileHandler(LOG_FILE, encoding="utf-8")
+_log_file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s: %(message)s"))
+# Coalesce log writes: records reach the file every 1000 lines, on ERROR, or on LOG_BUFFER.flush()
+LOG_BUFFER = logging.handlers.MemoryHandler(1000, flushLevel=logging.ERROR, target=_log_file_handler)
+logging.getLogger().setLevel(logging.INFO)
+logging.getLogger().addHandler(LOG_BUFFER)
 
 DEFAULT_EXCLUDE_FILES = {"p4p.exe", "pdb.lbr", "p4p.conf", "p4ps.exe", "svcinst.exe"}
+# Folders, relative to the cache root (case-insensitive), whose whole subtree is skipped
+# without being listed. Only these exact paths match: a depot folder of the same name
+# deeper in the tree is still cleaned.
+DEFAULT_EXCLUDE_DIRS = {"server.locks", "journals", ".p4root"}
+
+# Eviction policies: "lru" orders purely by access time; "gds" (greedy-dual-size flavour)
+# treats every doubling in file size as GDS_SECONDS_PER_DOUBLING of extra age, so large
+# stale files go first and the target is reached with fewer deletions.
+EVICTION_POLICIES = ("lru", "gds")
+GDS_SECONDS_PER_DOUBLING = 24 * 3600
 EXCLUDE_CONFIG_FILE = os.path.join(APPDATA_DIR, "excluded_files.json")
 
 
@@ -39,11 +54,83 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 
+# POSIX: list directories through an fd so DirEntry.stat() becomes a relative fstatat()
+_SCANDIR_FD = os.scandir in os.supports_fd and hasattr(os, "O_DIRECTORY")
+
+if sys.platform == "win32":
+    import ctypes
+
+    # Bound once: skips os.remove's argument conversion, and ctypes drops the GIL for the call
+    _DeleteFileW = ctypes.WinDLL("kernel32", use_last_error=True).DeleteFileW
+    _DeleteFileW.argtypes = [ctypes.c_wchar_p]
+    _DeleteFileW.restype = ctypes.c_bool
+
+    _MAX_PATH = 260
+
+    def _long_path(path):
+        r"""Add the \\?\ prefix to paths past MAX_PATH so DeleteFileW accepts them."""
+        if len(path) < _MAX_PATH or path.startswith("\\\\?\\"):
+            return path
+        path = os.path.abspath(path)  # the prefix needs an absolute, backslash-only path
+        if path.startswith("\\\\"):
+            return "\\\\?\\UNC\\" + path[2:]
+        return "\\\\?\\" + path
+
+    def _unlink(path):
+        if not _DeleteFileW(_long_path(path)):
+            raise ctypes.WinError(ctypes.get_last_error())
+else:
+    _unlink = os.unlink
+
+
+def _safe_unlink(path):
+    """Delete a file, returning the OSError instead of raising it (for executor.map)."""
+    try:
+        _unlink(path)
+    except OSError as e:
+        return e
+    return None
+
+
+@functools.lru_cache(maxsize=4)
 def load_stylesheet(path):
     with open(resource_path(path), "r", encoding="utf-8") as f:
         return f.read()
 
 
+class _OldestFiles:
+    """Bounded max-heap of the oldest scan entries that together cover target bytes.
+
+    Newer entries are evicted as soon as the older ones alone reach the target,
+    so memory is O(files to delete) rather than O(files in the cache).
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.size = 0
+        self._heap = []  # (-atime, size, dir, name): the newest kept entry sits at _heap[0]
+
+    def push(self, entry):
+        atime, size, dir_path, name = entry
+        if self._heap and self.size >= self.target and atime >= -self._heap[0][0]:
+            return  # newer than everything needed so far
+        heapq.heappush(self._heap, (-atime, size, dir_path, name))
+        self.size += size
+        while self._heap and self.size - self._heap[0][1] >= self.target:
+            self.size -= heapq.heappop(self._heap)[1]
+
+    @property
+    def cutoff(self):
+        """atime at or above which push() would discard an entry (inf until the target is covered)."""
+        if self._heap and self.size >= self.target:
+            return -self._heap[0][0]
+        return math.inf
+
+    def sorted(self):
+        """Return the kept entries as (atime, size, dir, name), oldest first."""
+        return sorted((-neg_atime, size, dir_path, name) for neg_atime, size, dir_path, name in self._heap)
+
+
 class BaseCacheCleaner:
     """Shared cache-cleaning logic used by both the CLI thread and GUI QThread workers."""
 
@@ -53,15 +140,45 @@ class BaseCacheCleaner:
                  folder_percent_keep,
                  drive_mode=True,
                  dry_run=False,
-                 exclude_files=None):
+                 exclude_files=None,
+                 policy="lru",
+                 exclude_dirs=None):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy!r}")
         self.path = path
         self.low_thresh = low_thresh
         self.high_thresh = high_thresh
         self.dry_run = dry_run
         self.drive_mode = drive_mode
         self.folder_percent_keep = folder_percent_keep
+        self.policy = policy
         self.exclude_files = set(exclude_files or [])
+        # Split once into exact names (set lookup) and globs (one compiled regex)
+        patterns = {p.lower() for p in self.exclude_files}
+        globs = [p for p in patterns if any(ch in p for ch in "*?[")]
+        self._exclude_names = frozenset(patterns.difference(globs))
+        # Lengths first: a name whose length matches no exclude skips the .lower() copy
+        self._exclude_name_lens = frozenset(len(p) for p in self._exclude_names)
+        self._exclude_re = (re.compile("|".join(fnmatch.translate(p) for p in globs), re.IGNORECASE)
+                            if globs else None)
+        self.exclude_dirs = frozenset(d.strip("/\\").lower() for d in (exclude_dirs or []))
+        # Excluded folders are relative to the cache root, so each is keyed by its parent's path
+        # spelled the way the scan builds it; a same-named folder elsewhere is still cleaned.
+        root_prefix = path if path.endswith(("/", os.sep)) else path + os.sep
+        children = {}
+        for d in self.exclude_dirs:
+            parts = [p for p in re.split(r"[\\/]", d) if p]
+            if parts:
+                parent = path if len(parts) == 1 else root_prefix + os.sep.join(parts[:-1])
+                children.setdefault(parent.lower(), set()).add(parts[-1])
+        self._exclude_dir_children = {parent: frozenset(names) for parent, names in children.items()}
+        self._exclude_dir_parent_lens = frozenset(len(parent) for parent in children)
         self._stop_event = threading.Event()
+        # Files at least this recently accessed are dropped in the scan workers, before a tuple
+        # is built. Only clean() lowers it (drive mode) and the value never rises mid-scan.
+        self._atime_cutoff = math.inf
+        self.scanned_files = 0
+        self.scanned_bytes = 0
         self.last_plan_path = None
 
     def request_stop(self):
@@ -75,154 +192,225 @@ class BaseCacheCleaner:
     def get_mb(self, size):
         return f"{size / (1024 * 1024):.2f} MB"
 
-    def count_files(self, path):
-        count = 0
-        for _, _, files in os.walk(path):
-            for f in files:
-                fl = f.lower()
-                if any(fnmatch.fnmatch(fl, p) for p in self.exclude_files):
-                    continue
-                count += 1
-        return count
-
-    def scan_dir(self, path, total_files, on_progress=None, on_log=None):
-        """Yield (atime, size, path) for every non-excluded file under path."""
-        scanned = 0
-        for root, _, files in os.walk(path):
-            for f in files:
-                fl = f.lower()
-                if any(fnmatch.fnmatch(fl, p) for p in self.exclude_files):
-                    continue
-                full_path = os.path.join(root, f)
-                try:
-                    stat = os.stat(full_path)
-                    scanned += 1
-                    if total_files:
-                        percent = int((scanned / total_files) * 100)
-                        if on_progress: on_progress(percent)
-                    yield (stat.st_atime, stat.st_size, full_path)
-                except Exception as e:
-                    if on_log: on_log(f"Error accessing {full_path}: {e}")
+    def _scan_one_dir(self, path):
+        """List one directory: (subdirs, files as (atime, size, dir, name), errors, file_count, file_bytes)."""
+        subdirs, files, errors = [], [], []
+        file_count = file_bytes = 0
+        cutoff = self._atime_cutoff
+        size_age = GDS_SECONDS_PER_DOUBLING if self.policy == "gds" else 0
+        # Exclude check is inlined below: it runs once per file, so skip the method call
+        exclude_names = self._exclude_names
+        exclude_name_lens = self._exclude_name_lens
+        exclude_match = self._exclude_re.match if self._exclude_re is not None else None
+        # "/" too: QFileDialog hands Windows drive roots over as "D:/"
+        prefix = path if path.endswith(("/", os.sep)) else path + os.sep
+        # Length first, so only directories that can be a parent of an excluded folder pay for .lower()
+        excluded_children = (self._exclude_dir_children.get(path.lower())
+                             if len(path) in self._exclude_dir_parent_lens else None)
+        dir_fd = None
+        try:
+            if _SCANDIR_FD:
+                # Listing through an fd makes each stat() an fstatat() relative to it, not a full path walk
+                dir_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+            with os.scandir(path if dir_fd is None else dir_fd) as it:
+                for entry in it:
+                    name = entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if excluded_children and name.lower() in excluded_children:
+                                continue  # prune: never listed, so no syscalls below it
+                            subdirs.append(prefix + name)
+                        elif entry.is_file(follow_symlinks=False):
+                            if ((len(name) in exclude_name_lens and name.lower() in exclude_names)
+                                    or (exclude_match and exclude_match(name))):
+                                continue
+                            st = entry.stat()
+                            # Counted before the cutoff check: the totals cover every non-excluded file
+                            file_count += 1
+                            file_bytes += st.st_size
+                            atime = st.st_atime
+                            if size_age:  # "gds": size-adjusted effective atime
+                                atime -= size_age * math.log2(st.st_size + 1)
+                            if atime >= cutoff:
+                                continue
+                            files.append((atime, st.st_size, path, name))
+                    except OSError as e:
+                        errors.append(f"Error accessing {prefix + name}: {e}")
+        except OSError as e:
+            errors.append(f"Error accessing {path}: {e}")
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+        return subdirs, files, errors, file_count, file_bytes
+
+    def scan_dir(self, path, on_progress=None, on_log=None):
+        """Yield (atime, size, dir, name) for every non-excluded file under path.
+
+        Directories are listed concurrently: readdir/stat release the GIL, so a
+        small thread pool keeps several requests in flight on slow or network
+        disks. Pending directories wait on a stack (LIFO, so the walk stays depth-
+        first and close on disk). Only the listings are bounded, so at most
+        MAX_IN_FLIGHT results are held at once; the stack itself holds every
+        directory found but not yet listed.
+
+        Progress is estimated without a counting pass: the root owns 100% and each
+        directory splits its share evenly among its subdirectories, so a share is
+        complete once a directory with no subdirectories has been listed.
+        """
+        SCAN_WORKERS = 32
+        MAX_IN_FLIGHT = SCAN_WORKERS * 4
+        SCAN_LOG_INTERVAL = 50000
+        self.scanned_files = 0
+        self.scanned_bytes = 0
+        dir_stack = [(path, 1.0)]  # (directory, share of the whole tree)
+        in_flight = set()
+        shares = {}
+        done_share = 0.0
+        reported = None
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+            while dir_stack or in_flight:
+                if self._stop_event.is_set():
+                    # Drop queued listings so only the ones already running are waited for
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+                while dir_stack and len(in_flight) < MAX_IN_FLIGHT:
+                    dir_path, share = dir_stack.pop()
+                    future = executor.submit(self._scan_one_dir, dir_path)
+                    shares[future] = share
+                    in_flight.add(future)
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    subdirs, files, errors, file_count, file_bytes = future.result()
+                    share = shares.pop(future)
+                    if subdirs:
+                        share /= len(subdirs)
+                        dir_stack.extend((d, share) for d in subdirs)
+                    else:
+                        done_share += share
+                        if on_progress:
+                            percent = round(100 * done_share, 1)
+                            if percent != reported:
+                                reported = percent
+                                on_progress(percent)
+                    logged_at = self.scanned_files // SCAN_LOG_INTERVAL
+                    self.scanned_files += file_count
+                    self.scanned_bytes += file_bytes
+                    if on_log:
+                        for msg in errors:
+                            on_log(msg)
+                        if self.scanned_files // SCAN_LOG_INTERVAL > logged_at:
+                            on_log(f"  Scanned {self.scanned_files:,} files...")
+                    yield from files
 
     def get_total_cache_size_and_files(self, on_log=None):
-        total_size = 0
-        file_info = []
-        for root, _, files in os.walk(self.path):
-            for f in files:
-                fl = f.lower()
-                if any(fnmatch.fnmatch(fl, p) for p in self.exclude_files):
-                    continue
-                fp = os.path.join(root, f)
-                try:
-                    stat = os.stat(fp)
-                    total_size += stat.st_size
-                    file_info.append((stat.st_atime, stat.st_size, fp))
-                except Exception as e:
-                    if on_log: on_log(f"Error accessing {fp}: {e}")
+        file_info = [(atime, size, os.path.join(dir_path, name))
+                     for atime, size, dir_path, name in self.scan_dir(self.path, on_log=on_log)]
+        total_size = sum(size for _, size, _ in file_info)
         return total_size, file_info
 
+    def _drive_target(self, on_log):
+        """Bytes to free to reach high_thresh % free, or None if nothing needs freeing."""
+        disk_total, disk_free, disk_free_percent = self.get_disk_info(self.path)
+        on_log(f"Total disk: {self.get_mb(disk_total)} | Free: {self.get_mb(disk_free)} | Free %: {disk_free_percent:.2f}%")
+        if disk_free_percent >= self.low_thresh:
+            on_log("Disk space above threshold, no action taken.")
+            return None
+        size_to_remove = (self.high_thresh * disk_total / 100) - disk_free
+        if size_to_remove <= 0:
+            # high_thresh at or below the current free % (or rounding): don't walk the cache
+            on_log(f"Target already met ({self.high_thresh}% free), no action taken.")
+            return None
+        on_log(f"Need to free {self.get_mb(size_to_remove)} to reach {self.high_thresh}% free.")
+        return size_to_remove
+
+    def _folder_target(self, total_size, on_log):
+        """Bytes to free to keep folder_percent_keep % of the cache, or None if already there."""
+        target_size = total_size * self.folder_percent_keep // 100
+        size_to_remove = total_size - target_size
+        if size_to_remove <= 0:
+            on_log("Cache size is within the configured percentage, no action taken.")
+            return None
+        on_log(f"Will reduce cache to {self.folder_percent_keep}% of current size "
+               f"(target: {self.get_mb(target_size)}).")
+        return size_to_remove
+
     def clean(self, on_log, on_progress):
         """
         Perform the cache cleaning operation in four phases:
-          1. Scan  — walk the cache directory and build a SQLite index
+          1. Scan  — walk the cache directory into an in-memory list
           2. Plan  — identify the oldest files that satisfy the removal target
           3. Record — write the candidate list to a text file on disk
           4. Execute — delete from the text file using concurrent workers
         """
         mode = "DRY RUN" if self.dry_run else "ACTUAL DELETION"
-        on_log(f"Starting cache clean operation ({mode})...")
+        on_log(f"Starting cache clean operation ({mode}, {self.policy} eviction)...")
 
         # Drive mode: check threshold before touching any files
         size_to_remove = None
         if self.drive_mode:
-            disk_total, disk_free, disk_free_percent = self.get_disk_info(self.path)
-            on_log(f"Total disk: {self.get_mb(disk_total)} | Free: {self.get_mb(disk_free)} | Free %: {disk_free_percent:.2f}%")
-            if disk_free_percent >= self.low_thresh:
-                on_log("Disk space above threshold, no action taken.")
+            size_to_remove = self._drive_target(on_log)
+            if size_to_remove is None:
                 on_progress(100)
                 return
-            size_to_remove = (self.high_thresh * disk_total / 100) - disk_free
-            on_log(f"Need to free {self.get_mb(size_to_remove)} to reach {self.high_thresh}% free.")
 
         # ── Phase 1: Scan ────────────────────────────────────────────────────
+        # No pre-count pass: the bar is indeterminate until the first subtree is done.
         on_progress(-1)
-        on_log("Phase 1/4: Scanning files into database...")
-
-        db_path = os.path.join(APPDATA_DIR, f'p4cleaner_{os.getpid()}_{int(time.time())}.db')
-        if os.path.exists(db_path):
-            os.remove(db_path)
+        on_log("Phase 1/4: Scanning files...")
 
-        conn = sqlite3.connect(db_path)
         try:
-            c = conn.cursor()
-            c.execute("PRAGMA synchronous=OFF")      # safe: temp DB, never recovered on crash
-            c.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
-            c.execute("PRAGMA temp_store=MEMORY")
-            c.execute("CREATE TABLE files (atime REAL, size INTEGER, path TEXT)")
-            conn.commit()
-
-            insert_batch = []
-            SCAN_BATCH = 50000
-            scanned = 0
-            for atime, size, path in self.scan_dir(self.path, None, None, on_log):
-                insert_batch.append((atime, size, path))
-                scanned += 1
-                if len(insert_batch) >= SCAN_BATCH:
-                    c.executemany("INSERT INTO files VALUES (?, ?, ?)", insert_batch)
-                    conn.commit()
-                    insert_batch.clear()
-                    on_log(f"  Scanned {scanned:,} files...")
-            if insert_batch:
-                c.executemany("INSERT INTO files VALUES (?, ?, ?)", insert_batch)
-                conn.commit()
-
-            on_log(f"  Building sort index on {scanned:,} files...")
-            c.execute("CREATE INDEX idx_atime ON files (atime)")
-            conn.commit()
-
-            c.execute("SELECT COUNT(*), SUM(size) FROM files")
-            file_count, total_size = c.fetchone()
-            total_size = total_size or 0
-            on_log(f"Phase 1/4 done: {file_count:,} files ({self.get_mb(total_size)}) indexed.")
+            # Drive mode knows its target up front, so only the oldest files that
+            # cover it are kept; folder mode needs the full total before it can choose.
+            oldest = _OldestFiles(size_to_remove) if size_to_remove is not None else None
+            entries = []
+            try:
+                for entry in self.scan_dir(self.path, on_progress, on_log):
+                    if oldest is not None:
+                        oldest.push(entry)
+                        self._atime_cutoff = oldest.cutoff
+                    else:
+                        entries.append(entry)
+            finally:
+                self._atime_cutoff = math.inf
+            if self._stop_event.is_set():
+                on_log("Stop requested, cleaning aborted.")
+                return
+            total_size = self.scanned_bytes
+            on_log(f"Phase 1/4 done: {self.scanned_files:,} files ({self.get_mb(total_size)}) found.")
 
             if not self.drive_mode:
-                target_size = total_size * self.folder_percent_keep // 100
-                size_to_remove = total_size - target_size
-                if size_to_remove <= 0:
-                    on_log("Cache size is within the configured percentage, no action taken.")
+                size_to_remove = self._folder_target(total_size, on_log)
+                if size_to_remove is None:
                     on_progress(100)
                     return
-                on_log(f"Will reduce cache to {self.folder_percent_keep}% of current size "
-                       f"(target: {self.get_mb(target_size)}).")
 
             assert size_to_remove is not None  # always set above; narrows type for checker
+            on_progress(-1)  # the scan's 100% is stale; indeterminate until the delete total is known
             on_log(f"Phase 2/4: Identifying candidates (need to free {self.get_mb(size_to_remove)})...")
             plan_path = os.path.join(APPDATA_DIR, f'p4cleaner_plan_{os.getpid()}_{int(time.time())}.txt')
             plan_size = 0
             plan_count = 0
 
-            plan_cursor = conn.cursor()
-            plan_cursor.execute("SELECT path, size FROM files ORDER BY atime ASC")
+            # Tuples compare on atime first, so a plain sort orders oldest-first
+            if oldest is not None:
+                entries = oldest.sorted()
+                oldest = None  # the heap holds its own copy of every kept tuple; drop it now
+            else:
+                entries.sort()
             with open(plan_path, 'w', encoding='utf-8') as pf:
-                for path, size in plan_cursor:
+                for _, size, dir_path, name in entries:
                     if plan_size >= size_to_remove:
                         break
+                    path = os.path.join(dir_path, name)  # full path only for files in the plan
                     pf.write(f"{path}\t{size}\n")
                     plan_size += size
                     plan_count += 1
-            plan_cursor.close()
+            del entries
 
             self.last_plan_path = plan_path
             on_log(f"Phase 2/4 done: {plan_count:,} files ({self.get_mb(plan_size)}) identified.")
             on_log(f"Phase 3/4: Candidate list saved to: {plan_path}")
 
-            c.close()
-            conn.close()
-            try:
-                os.remove(db_path)
-            except FileNotFoundError:
-                pass
-
             if self.dry_run:
                 on_log("Dry run complete — no files deleted. Review the candidate list above.")
                 on_progress(100)
@@ -232,8 +420,8 @@ class BaseCacheCleaner:
             removed_size = 0
             deleted = 0
             failed = 0
-            DELETE_BATCH = 1000
-            DELETE_WORKERS = 10
+            DELETE_BATCH = 500  # also the disk-free recheck interval in drive mode
+            DELETE_WORKERS = 32
             LOG_INTERVAL = 1000
 
             def _read_plan_batches():
@@ -254,13 +442,9 @@ class BaseCacheCleaner:
                     if self._stop_event.is_set():
                         on_log("Stop requested, cleaning aborted.")
                         break
-                    future_to_info = {
-                        executor.submit(os.remove, path): (path, size)
-                        for path, size in batch
-                    }
-                    for future in as_completed(future_to_info):
-                        path, size = future_to_info[future]
-                        exc = future.exception()
+                    results = executor.map(_safe_unlink, [path for path, _ in batch])
+                    failures = []
+                    for (path, size), exc in zip(batch, results):
                         if exc is None:
                             removed_size += size
                             deleted += 1
@@ -269,8 +453,17 @@ class BaseCacheCleaner:
                                        f"({self.get_mb(removed_size)})...")
                         else:
                             failed += 1
-                            on_log(f"Failed: {path} — {exc}")
+                            failures.append(f"Failed: {path} — {exc}")
+                    if failures:
+                        on_log("\n".join(failures))  # one emit per batch, not per file
                     on_progress(round(100 * deleted / plan_count, 1) if plan_count else 100.0)
+                    # Drive mode: stop once the disk really reports the target, which
+                    # can happen before removed_size adds up (hardlinks, sparse files)
+                    if self.drive_mode:
+                        _, _, free_percent = self.get_disk_info(self.path)
+                        if free_percent >= self.high_thresh:
+                            on_log(f"Target reached ({free_percent:.2f}% free), stopping early.")
+                            break
 
             fail_note = f", {failed:,} failed" if failed else ""
             on_log(f"Phase 4/4 done: {self.get_mb(removed_size)} removed, "
@@ -281,50 +474,75 @@ class BaseCacheCleaner:
         except Exception as e:
             on_log(f"Exception occurred: {e}")
             logging.exception("clean() exception")
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
-            try:
-                os.remove(db_path)
-            except (FileNotFoundError, PermissionError):
-                pass
 
 
 class ThreadedCacheCleaner(threading.Thread, BaseCacheCleaner):
     """CLI worker — runs clean() in a background thread, printing to stdout."""
 
     def __init__(self, path, low_thresh, high_thresh, folder_keep_percent, drive_mode, dry_run=False,
-                 exclude_files=None):
+                 exclude_files=None, policy="lru", exclude_dirs=None):
         threading.Thread.__init__(self)
         BaseCacheCleaner.__init__(self, path, low_thresh, high_thresh, folder_keep_percent, drive_mode, dry_run,
-                                  exclude_files=list(exclude_files or []))
+                                  exclude_files=list(exclude_files or []), policy=policy,
+                                  exclude_dirs=exclude_dirs)
 
     def run(self):
         def print_and_log(msg):
             print(msg)
             logging.info(msg)
         self.clean(print_and_log, lambda _: None)
+        LOG_BUFFER.flush()
 
 
 class QtCacheCleanerWorker(QThread):
-    """GUI worker — runs clean() in a QThread, forwarding output via Qt signals."""
+    """GUI worker — runs clean() in a QThread, forwarding output via Qt signals.
+
+    Log lines and the latest progress value are stored by the worker thread and
+    flushed to the GUI by a ~10 Hz timer on the GUI thread, so bursts cost one
+    signal per tick instead of one per line or per progress step.
+    """
     progress_signal = Signal(float)
-    log_signal = Signal(str)
+    log_batch_signal = Signal(list)
     done_signal = Signal()
 
+    FLUSH_MS = 100
+
     def __init__(self, path, low_thresh, high_thresh, folder_keep_percent, drive_mode, dry_run=False,
-                 exclude_files=None):
+                 exclude_files=None, policy="lru", exclude_dirs=None):
         QThread.__init__(self)
         self._cleaner = BaseCacheCleaner(path, low_thresh, high_thresh, folder_keep_percent, drive_mode, dry_run,
-                                         exclude_files=list(exclude_files or []))
+                                         exclude_files=list(exclude_files or []), policy=policy,
+                                         exclude_dirs=exclude_dirs)
+        self._pending_logs = collections.deque()  # append/popleft are thread-safe
+        self._pending_progress = None  # latest value only; a single attribute store is atomic
+        self._emitted_progress = None
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(self.FLUSH_MS)
+        self._flush_timer.timeout.connect(self._flush)
+        self.started.connect(self._flush_timer.start)
+        # Connected before any GUI slot, so the final updates land before done handlers run
+        self.done_signal.connect(self._flush)
+        self.done_signal.connect(self._flush_timer.stop)
 
     def request_stop(self):
         self._cleaner.request_stop()
 
+    def _set_progress(self, value):
+        self._pending_progress = value
+
+    def _flush(self):
+        batch = []
+        while self._pending_logs:
+            batch.append(self._pending_logs.popleft())
+        if batch:
+            self.log_batch_signal.emit(batch)
+        value = self._pending_progress
+        if value is not None and value != self._emitted_progress:
+            self._emitted_progress = value
+            self.progress_signal.emit(value)
+
     def run(self):
-        self._cleaner.clean(self.log_signal.emit, self.progress_signal.emit)
+        self._cleaner.clean(self._pending_logs.append, self._set_progress)
         self.done_signal.emit()
 
 
@@ -356,7 +574,7 @@ class LogPopOut(QDialog):
         btn_row = QHBoxLayout()
         open_btn = QPushButton("Open Log File")
         open_btn.setObjectName("secondary_btn")
-        open_btn.clicked.connect(lambda: parent._open_file(LOG_FILE))
+        open_btn.clicked.connect(parent._open_log_file)
         clear_btn = QPushButton("Clear")
         clear_btn.setObjectName("secondary_btn")
         clear_btn.clicked.connect(self._clear)
@@ -364,17 +582,20 @@ class LogPopOut(QDialog):
         btn_row.addWidget(open_btn)
         btn_row.addWidget(clear_btn)
 
-        self.log_text = QTextEdit()
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setFont(QFont("Consolas", 10))
-        self.log_text.setHtml(current_html)
+        self.log_text.appendHtml(current_html)
 
         layout.addLayout(btn_row)
         layout.addWidget(self.log_text)
         self.setLayout(layout)
 
-    def append(self, message: str):
-        self.log_text.append(message)
+    def append(self, message: str, html: bool = False):
+        if html:
+            self.log_text.appendHtml(message)
+        else:
+            self.log_text.appendPlainText(message)
 
     def _clear(self):
         self.log_text.clear()
@@ -546,10 +767,12 @@ class P4PCleanUI(QWidget):
         logs_layout = QVBoxLayout()
         logs_layout.setSpacing(6)
 
-        self.log_output = QTextEdit()
+        self.log_output = QPlainTextEdit()
         self.log_output.setReadOnly(True)
         self.log_output.setFont(QFont("Consolas", 10))
         self.log_output.setMinimumHeight(200)
+        # Qt trims the oldest lines itself — keeps appends O(1) on long runs
+        self.log_output.setMaximumBlockCount(100)
 
         log_btn_row = QHBoxLayout()
         self.open_plan_button = QPushButton("Open Plan File")
@@ -558,7 +781,7 @@ class P4PCleanUI(QWidget):
         self.open_plan_button.clicked.connect(self._open_plan_file)
         open_log_btn = QPushButton("Open Log File")
         open_log_btn.setObjectName("secondary_btn")
-        open_log_btn.clicked.connect(lambda: self._open_file(LOG_FILE))
+        open_log_btn.clicked.connect(self._open_log_file)
         popout_btn = QPushButton("Pop Out")
         popout_btn.setObjectName("secondary_btn")
         popout_btn.clicked.connect(self._show_popout)
@@ -588,10 +811,7 @@ class P4PCleanUI(QWidget):
         self.folder_radio.toggled.connect(self.update_ui_fields)
         self.update_ui_fields()
 
-        self.light_stylesheet = load_stylesheet(resource_path("resources/css/light_mode.css"))
-        self.dark_stylesheet = load_stylesheet(resource_path("resources/css/dark_mode.css"))
-        self.setStyleSheet(self.light_stylesheet)
-        self._gui_log_buffer = collections.deque(maxlen=100)
+        self.setStyleSheet(self._current_stylesheet())
         self.append_log(f"Logs are also saved to: {LOG_FILE}")
 
     def closeEvent(self, event):
@@ -622,13 +842,17 @@ class P4PCleanUI(QWidget):
             except Exception:
                 pass
 
+    def _current_stylesheet(self):
+        # Loaded on first use and cached, so the dark sheet is only read if it is picked
+        name = "dark_mode.css" if self.dark_mode else "light_mode.css"
+        return load_stylesheet(resource_path(f"resources/css/{name}"))
+
     def toggle_theme(self):
         self.dark_mode = not self.dark_mode
+        self.setStyleSheet(self._current_stylesheet())
         if self.dark_mode:
-            self.setStyleSheet(self.dark_stylesheet)
             self.theme_button.setText("☀️  Light")
         else:
-            self.setStyleSheet(self.light_stylesheet)
             self.theme_button.setText("🌙  Dark")
         self._apply_title_bar_theme(self.dark_mode)
 
@@ -669,13 +893,24 @@ class P4PCleanUI(QWidget):
         if dir_path:
             self.path_input.setText(dir_path)
 
-    def append_log(self, message):
-        self._gui_log_buffer.append(message)
-        self.log_output.append(message)
+    def append_log(self, message, html=False):
+        if html:
+            self.log_output.appendHtml(message)
+        else:
+            self.log_output.appendPlainText(message)
         if self._popout is not None:
-            self._popout.append(message)
+            self._popout.append(message, html)
         logging.info(message)
 
+    def append_logs(self, messages):
+        """Append a batch of worker log lines with a single widget update."""
+        text = "\n".join(messages)
+        self.log_output.appendPlainText(text)
+        if self._popout is not None:
+            self._popout.append(text)
+        for message in messages:
+            logging.info(message)
+
     def _open_file(self, path: str):
         if not os.path.exists(path):
             return
@@ -685,6 +920,10 @@ class P4PCleanUI(QWidget):
             import subprocess
             subprocess.Popen(["xdg-open", path])
 
+    def _open_log_file(self):
+        LOG_BUFFER.flush()  # show everything logged so far, not just the last full buffer
+        self._open_file(LOG_FILE)
+
     def _open_plan_file(self):
         plan_path = getattr(getattr(self, "cleaner", None), "_cleaner", None)
         plan_path = getattr(plan_path, "last_plan_path", None)
@@ -696,18 +935,16 @@ class P4PCleanUI(QWidget):
             self._popout.raise_()
             self._popout.activateWindow()
             return
-        stylesheet = self.dark_stylesheet if self.dark_mode else self.light_stylesheet
-        self._popout = LogPopOut(self, self.log_output.toHtml(), stylesheet)
+        self._popout = LogPopOut(self, self.log_output.document().toHtml(), self._current_stylesheet())
         self._popout.show()
 
     def start_cleaning(self):
         path = self.path_input.text().strip()
         if not os.path.isdir(path):
-            self.append_log("<span style='color:red;font-weight:bold'>Invalid path.</span>")
+            self.append_log("<span style='color:red;font-weight:bold'>Invalid path.</span>", html=True)
             return
 
         self.log_output.clear()
-        self._gui_log_buffer.clear()
         self.progress.setValue(0)
         self.status_bar.setText("Starting...")
         self.start_button.setEnabled(False)
@@ -720,15 +957,17 @@ class P4PCleanUI(QWidget):
             self.percent_spin.value(),
             self.drive_radio.isChecked(),
             dry_run,
-            self.exclude_files
+            self.exclude_files,
+            exclude_dirs=DEFAULT_EXCLUDE_DIRS
         )
         self.cleaner.progress_signal.connect(self.on_progress_update)
-        self.cleaner.log_signal.connect(self.append_log)
+        self.cleaner.log_batch_signal.connect(self.append_logs)
         self.cleaner.done_signal.connect(self.cleaning_done)
         self.cleaner.start()
 
     def cleaning_done(self):
-        self.append_log("<b>Cleaning operation finished.</b>")
+        self.append_log("<b>Cleaning operation finished.</b>", html=True)
+        LOG_BUFFER.flush()
         self.status_bar.setText("Done.")
         self.start_button.setEnabled(True)
         plan_path = getattr(getattr(self, "cleaner", None), "_cleaner", None)
@@ -740,7 +979,9 @@ class P4PCleanUI(QWidget):
 
 # --- CLI entry point ---
 
-def run_headless(path, low_thresh, high_thresh, folder_percent_keep, drive_mode, dry_run, exclude_files):
+def run_headless(*, path, low_thresh, high_thresh, folder_percent_keep, drive_mode, dry_run, exclude_files,
+                 policy="lru", exclude_dirs=None):
+    # Keyword-only: folder_percent_keep (int) and drive_mode (bool) are easy to swap positionally
     if not os.path.isdir(path):
         print("Invalid path.")
         sys.exit(1)
@@ -751,7 +992,9 @@ def run_headless(path, low_thresh, high_thresh, folder_percent_keep, drive_mode,
         folder_percent_keep,
         drive_mode,
         dry_run,
-        exclude_files
+        exclude_files=exclude_files,
+        policy=policy,
+        exclude_dirs=exclude_dirs
     )
     worker.start()
     worker.join()
@@ -848,6 +1091,14 @@ def main():
     parser.add_argument('--drive-mode', action='store_true', help='Use entire drive mode (default)')
     parser.add_argument('--folder-mode', action='store_true', help='Use folder mode (regulate cache folder size)')
     parser.add_argument('--dry-run', action='store_true', help='Perform a dry run (no files will be deleted)')
+    parser.add_argument('--policy', choices=EVICTION_POLICIES, default='lru',
+                        help='Eviction order: lru = oldest access first (default), '
+                             'gds = size-aware, prefers large stale files')
+    parser.add_argument('--exclude-dir', action='append', default=[], metavar='FOLDER',
+                        help='Folder (relative to --path) to skip entirely, in addition to '
+                             f'{", ".join(sorted(DEFAULT_EXCLUDE_DIRS))} (repeatable)')
+    parser.add_argument('--no-default-exclude-dirs', action='store_true',
+                        help='Also scan and clean the default excluded folders')
     parser.add_argument('--show-excluded', action='store_true', help='Show excluded files/patterns')
     parser.add_argument('--add-excluded', type=str, help='Add a file or pattern to excluded files')
     parser.add_argument('--remove-excluded', type=str, help='Remove a file or pattern from excluded files')
@@ -876,13 +1127,15 @@ def main():
 
     if args.path:
         run_headless(
-            args.path,
-            args.low,
-            args.high,
-            args.percent,
-            drive_mode,
-            args.dry_run,
-            exclude_files=exclude_files
+            path=args.path,
+            low_thresh=args.low,
+            high_thresh=args.high,
+            folder_percent_keep=args.percent,
+            drive_mode=drive_mode,
+            dry_run=args.dry_run,
+            exclude_files=exclude_files,
+            policy=args.policy,
+            exclude_dirs=(set() if args.no_default_exclude_dirs else DEFAULT_EXCLUDE_DIRS) | set(args.exclude_dir)
         )
     else:
         app = QApplication(sys.argv)